@@ -1,11 +1,12 @@
 import streamlit as st
-import bcrypt
-from datetime import datetime, date
+import pymongo
+from pymongo import UpdateOne
+from datetime import datetime, date, timezone
 from bson import ObjectId  # For handling MongoDB's _id
 
 # Import database connection and helper functions from db.py
 from db import (
-    MongoDBConnection, generate_unique_id,
+    get_connection, generate_unique_id, hash_password, check_password, clear_password_cache,
     get_users_collection, get_rooms_collection, get_room_requests_collection,
     get_maintenance_collection, get_events_collection, get_fees_collection,
     get_visitors_collection, get_feedback_collection
@@ -14,55 +15,84 @@ from db import (
 # --- Initialize DB Connection ---
 # This will create the connection if it doesn't exist or return the existing one
 try:
-    db_connection = MongoDBConnection()
+    db_connection = get_connection()
 except Exception as e:
     st.error(f"Failed to connect to database: {e}")
     st.stop()
 
-# --- Password Hashing ---
-def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-
-def check_password(password, hashed):
-    return bcrypt.checkpw(password.encode('utf-8'), hashed)
+# --- Constants ---
+# Selectbox options and their index lookups, built once instead of on every render
+ROOM_TYPES = ("single", "double", "triple")
+ROOM_TYPE_INDEX = {v: i for i, v in enumerate(ROOM_TYPES)}
+HOSTEL_BLOCKS = ("Block A", "Block B", "Block C")
+HOSTEL_BLOCK_INDEX = {v: i for i, v in enumerate(HOSTEL_BLOCKS)}
+MAINTENANCE_STATUSES = ("Pending", "In Progress", "Completed")
+MAINTENANCE_STATUS_INDEX = {v: i for i, v in enumerate(MAINTENANCE_STATUSES)}
+
+# Roles and room statuses
+ROLE_ADMIN = 'admin'
+ROLE_STAFF = 'staff'
+ROLE_STUDENT = 'student'
+MAINTENANCE_SUBMIT_ROLES = frozenset({ROLE_STUDENT, ROLE_STAFF})
+MAINTENANCE_MANAGE_ROLES = frozenset({ROLE_ADMIN, ROLE_STAFF})
+STATUS_OCCUPIED = 'occupied'
+STATUS_AVAILABLE = 'available'
+
+# Lists are read in bounded pages; "Load more" raises the limit by one page
+EVENTS_PAGE_SIZE = 20
+LIST_PAGE_SIZE = 50
+ROOMS_PAGE_SIZE = 25
+RECORDS_PAGE_SIZE = 20
+
+# Date inputs are stored as midnight datetimes
+_MIDNIGHT = datetime.min.time()
+
+# Fields the room views actually render. assignedUserName/assignedUserCustomId are
+# copies of the assigned user's name and userId, kept on the room so no join is needed.
+ROOM_FIELDS = {"number": 1, "roomType": 1, "hostelBlock": 1, "status": 1, "userId": 1,
+               "assignedUserName": 1, "assignedUserCustomId": 1}
 
 # --- User Management Functions ---
 def register_user(name, email, password, role):
     users_collection = get_users_collection()
     try:
-        if users_collection.find_one({"email": email}):
-            return False, "Email already exists."
-        if role == "admin":
-            if users_collection.find_one({"role": "admin"}):
+        if role == ROLE_ADMIN:
+            if users_collection.count_documents({"role": ROLE_ADMIN}, limit=1):
                 return False, "Admin already exists. Only one admin allowed."
 
-        hashed_password = hash_password(password)
-        user_id_val = ""
-        while True:
-            user_id_val = generate_unique_id()
-            if not users_collection.find_one({"userId": user_id_val}):
-                break
-
         user_data = {
-            "userId": user_id_val,
+            "userId": None,
             "name": name,
             "email": email,
-            "password": hashed_password,
+            "password": hash_password(password),
             "role": role,
-            "createdAt": datetime.utcnow()
+            "createdAt": datetime.now(timezone.utc)
         }
-        users_collection.insert_one(user_data)
-        return True, "User registered successfully."
-    except pymongo.errors.DuplicateKeyError:
-        return False, "Registration failed: Email or UserID already exists (race condition or index issue)."
+        # Email and userId uniqueness are enforced by unique indexes, so no pre-read is needed
+        for _ in range(3):
+            user_data["userId"] = generate_unique_id()
+            try:
+                users_collection.insert_one(user_data)
+                fetch_student_options.clear()
+                return True, "User registered successfully."
+            except pymongo.errors.DuplicateKeyError as e:
+                # Older servers may omit keyPattern; fall back to keyValue, then the index name in errmsg
+                details = e.details or {}
+                key_fields = details.get("keyPattern") or details.get("keyValue") or {}
+                if "email" in key_fields or "email_1" in details.get("errmsg", str(e)):
+                    return False, "Email already exists."
+                # userId collision: generate a new one and retry
+        return False, "Registration failed: could not generate a unique UserID."
     except Exception as e:
         return False, f"Registration failed: {str(e)}"
 
 def login_user(email, password):
     users_collection = get_users_collection()
     try:
-        user = users_collection.find_one({"email": email})
+        user = users_collection.find_one({"email": email}, {"name": 1, "email": 1, "role": 1, "userId": 1, "password": 1})
         if user and check_password(password, user["password"]):
+            # The hash is only needed for the check; keep it out of session state
+            user.pop('password', None)
             # Convert ObjectId to string for session state
             user['_id'] = str(user['_id'])
             return user
@@ -71,17 +101,97 @@ def login_user(email, password):
         st.error(f"Login failed: {str(e)}")
         return None
 
-# --- Helper to get user by _id (string) ---
-def get_user_by_id_str(user_id_str):
+# --- Helper to resolve many users in one query (avoids a find_one per row) ---
+def get_users_map(user_ids):
+    ids = list({uid for uid in user_ids if uid})
+    if not ids:
+        return {}
     users_collection = get_users_collection()
-    try:
-        return users_collection.find_one({"_id": ObjectId(user_id_str)})
-    except:
-        return None
+    return {u['_id']: u for u in users_collection.find({"_id": {"$in": ids}}, {"name": 1, "userId": 1})}
+
+# --- Paginated reads ---
+# The current page index for each list lives in st.session_state[state_key].
+def fetch_page(cursor, state_key):
+    # Reads one page of a sorted cursor, plus one extra row to tell whether a next page exists
+    page = st.session_state.get(state_key, 0)
+    docs = list(cursor.skip(page * RECORDS_PAGE_SIZE).limit(RECORDS_PAGE_SIZE + 1))
+    return docs[:RECORDS_PAGE_SIZE], len(docs) > RECORDS_PAGE_SIZE
+
+def render_pager(state_key, has_next):
+    page = st.session_state.get(state_key, 0)
+    if page == 0 and not has_next:
+        return
+    pager_cols = st.columns([1, 1, 4])
+    if pager_cols[0].button("Previous", key=f"{state_key}_prev", disabled=page == 0):
+        st.session_state[state_key] = page - 1
+        st.rerun()
+    if pager_cols[1].button("Next", key=f"{state_key}_next", disabled=not has_next):
+        st.session_state[state_key] = page + 1
+        st.rerun()
+    pager_cols[2].caption(f"Page {page + 1}")
+
+def fetch_joined_page(collection, query, sort, projection, user_field, state_key):
+    # Like fetch_page, but joins the user referenced by user_field server-side as "student"
+    page = st.session_state.get(state_key, 0)
+    docs = list(collection.aggregate([
+        {"$match": query},
+        {"$sort": sort},
+        {"$skip": page * RECORDS_PAGE_SIZE},
+        {"$limit": RECORDS_PAGE_SIZE + 1},
+        {"$project": projection},
+        {"$lookup": {
+            "from": "users",
+            "localField": user_field,
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"_id": 0, "name": 1, "userId": 1}}],
+            "as": "student"
+        }},
+        {"$unwind": {"path": "$student", "preserveNullAndEmptyArrays": True}}
+    ]))
+    return docs[:RECORDS_PAGE_SIZE], len(docs) > RECORDS_PAGE_SIZE
+
+# --- Cached reads ---
+# Streamlit reruns the whole script on every widget interaction, so list reads are
+# memoized briefly. Every write calls the matching fetch_*.clear() before rerunning.
+@st.cache_data(ttl=5, show_spinner=False)
+def fetch_rooms(role, user_id_str, page=0):
+    # Returns one page of rooms (sorted by number) and the total matching count
+    rooms_collection = get_rooms_collection()
+    query = {"userId": ObjectId(user_id_str)} if role == ROLE_STUDENT else {}
+    rooms = list(rooms_collection.find(query, ROOM_FIELDS).sort("number").skip(page * ROOMS_PAGE_SIZE).limit(ROOMS_PAGE_SIZE))
+    return rooms, rooms_collection.count_documents(query)
+
+@st.cache_data(ttl=5, show_spinner=False)
+def fetch_pending_requests(limit):
+    return list(get_room_requests_collection().find({"status": "pending"}, {"userId": 1}).sort("requestedAt", 1).limit(limit))
+
+@st.cache_data(ttl=5, show_spinner=False)
+def fetch_maintenance(role, user_id_str, limit):
+    query = {"userId": ObjectId(user_id_str)} if role == ROLE_STUDENT else {}
+    # The display timestamp is formatted server-side instead of per row in Python
+    return list(get_maintenance_collection().aggregate([
+        {"$match": query},
+        {"$sort": {"createdAt": -1}},
+        {"$limit": limit},
+        {"$project": {
+            "userId": 1, "description": 1, "status": 1,
+            "createdAtStr": {"$dateToString": {"format": "%Y-%m-%d %H:%M", "date": "$createdAt"}}
+        }}
+    ]))
+
+@st.cache_data(ttl=5, show_spinner=False)
+def fetch_events(today):
+    # Two bounded range scans on the date index instead of reading every event
+    events_collection = get_events_collection()
+    upcoming = list(events_collection.find({"date": {"$gte": today}}, {"title": 1, "date": 1}).sort("date", 1).limit(EVENTS_PAGE_SIZE))
+    past = list(events_collection.find({"date": {"$lt": today}}, {"title": 1, "date": 1}).sort("date", -1).limit(EVENTS_PAGE_SIZE))
+    return upcoming, past
 
-def get_user_by_custom_id(custom_user_id):
-    users_collection = get_users_collection()
-    return users_collection.find_one({"userId": custom_user_id})
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_student_options():
+    # Selectbox label -> student _id string, for the fee form
+    students = get_users_collection().find({"role": ROLE_STUDENT}, {"userId": 1, "name": 1, "_id": 1})
+    return {f"{u['name']} ({u['userId']})": str(u['_id']) for u in students}
 
 # --- Streamlit App State Initialization ---
 if "logged_in" not in st.session_state:
@@ -103,6 +213,8 @@ def display_login_page():
             if user:
                 st.session_state.logged_in = True
                 st.session_state.user = user
+                # Parse the session user's ObjectId once instead of on every rerun
+                st.session_state.user_oid = ObjectId(user['_id'])
                 st.session_state.page = "Dashboard"
                 st.success("Logged in successfully!")
                 st.rerun()
@@ -119,7 +231,7 @@ def display_register_page():
         name = st.text_input("Name")
         email = st.text_input("Email")
         password = st.text_input("Password", type="password")
-        role = st.selectbox("Role", ["student", "staff", "admin"])
+        role = st.selectbox("Role", [ROLE_STUDENT, ROLE_STAFF, ROLE_ADMIN])
         submit_button = st.form_submit_button("Register")
 
         if submit_button:
@@ -143,14 +255,15 @@ def display_room_management():
     st.subheader("Room Management")
     rooms_collection = get_rooms_collection()
     users_collection = get_users_collection()
+    user_role = st.session_state.user['role']
 
     # Add Room Form (Admin only)
-    if st.session_state.user['role'] == 'admin':
+    if user_role == ROLE_ADMIN:
         with st.expander("Add New Room", expanded=False):
             with st.form("add_room_form", clear_on_submit=True):
                 number = st.text_input("Room Number")
-                room_type = st.selectbox("Room Type", ["single", "double", "triple"])
-                hostel_block = st.selectbox("Hostel Block", ["Block A", "Block B", "Block C"])
+                room_type = st.selectbox("Room Type", ROOM_TYPES)
+                hostel_block = st.selectbox("Hostel Block", HOSTEL_BLOCKS)
                 assign_user_id_str = st.text_input("Assign to User's Custom ID (Optional)")
 
                 submitted = st.form_submit_button("Add Room")
@@ -159,37 +272,40 @@ def display_room_management():
                         st.error("Room number, type, and block are required.")
                     else:
                         try:
-                            if rooms_collection.find_one({"number": number}):
-                                st.error("Room number already exists.")
-                            else:
-                                user_to_assign = None
-                                user_mongo_id = None
-                                if assign_user_id_str:
-                                    user_to_assign = users_collection.find_one({"userId": assign_user_id_str})
-                                    if not user_to_assign:
-                                        st.error(f"User with custom ID '{assign_user_id_str}' not found.")
+                            user_to_assign = None
+                            user_mongo_id = None
+                            if assign_user_id_str:
+                                user_to_assign = users_collection.find_one({"userId": assign_user_id_str}, {"name": 1, "userId": 1})
+                                if not user_to_assign:
+                                    st.error(f"User with custom ID '{assign_user_id_str}' not found.")
+                                else:
+                                    # Check if this user already has a room
+                                    if rooms_collection.count_documents({"userId": user_to_assign['_id']}, limit=1):
+                                        st.error(f"User {user_to_assign['name']} already has a room assigned.")
+                                        user_to_assign = None
                                     else:
-                                        # Check if this user already has a room
-                                        if rooms_collection.find_one({"userId": user_to_assign['_id']}):
-                                            st.error(f"User {user_to_assign['name']} already has a room assigned.")
-                                            user_to_assign = None
-                                        else:
-                                            user_mongo_id = user_to_assign['_id']
+                                        user_mongo_id = user_to_assign['_id']
 
-                                if assign_user_id_str and not user_to_assign:
-                                    pass
-                                else:
-                                    room_data = {
-                                        "number": number,
-                                        "roomType": room_type,
-                                        "hostelBlock": hostel_block,
-                                        "userId": user_mongo_id,
-                                        "status": "occupied" if user_mongo_id else "available",
-                                        "createdAt": datetime.utcnow()
-                                    }
-                                    rooms_collection.insert_one(room_data)
-                                    st.success(f"Room {number} added successfully.")
-                                    st.rerun()
+                            if assign_user_id_str and not user_to_assign:
+                                pass
+                            else:
+                                room_data = {
+                                    "number": number,
+                                    "roomType": room_type,
+                                    "hostelBlock": hostel_block,
+                                    "userId": user_mongo_id,
+                                    "assignedUserName": user_to_assign['name'] if user_mongo_id else None,
+                                    "assignedUserCustomId": user_to_assign['userId'] if user_mongo_id else None,
+                                    "status": STATUS_OCCUPIED if user_mongo_id else STATUS_AVAILABLE,
+                                    "createdAt": datetime.now(timezone.utc)
+                                }
+                                rooms_collection.insert_one(room_data)
+                                fetch_rooms.clear()
+                                st.success(f"Room {number} added successfully.")
+                                st.rerun()
+                        except pymongo.errors.DuplicateKeyError:
+                            # rooms.number is uniquely indexed, so the insert itself rejects duplicates
+                            st.error("Room number already exists.")
                         except Exception as e:
                             st.error(f"Failed to add room: {str(e)}")
 
@@ -197,90 +313,91 @@ def display_room_management():
     st.markdown("---")
     st.write("**Existing Rooms:**")
 
-    query = {}
-    if st.session_state.user['role'] == 'student':
-        query = {"userId": ObjectId(st.session_state.user['_id'])}
+    page = st.session_state.get('rooms_page', 0) if user_role == ROLE_ADMIN else 0
 
     try:
-        all_rooms = list(rooms_collection.find(query).sort("number"))
+        all_rooms, total_rooms = fetch_rooms(user_role, st.session_state.user['_id'], page)
     except Exception as e:
         st.error(f"Failed to fetch rooms: {str(e)}")
         return
 
-    if not all_rooms and st.session_state.user['role'] == 'student':
+    total_pages = -(-total_rooms // ROOMS_PAGE_SIZE)
+    if page and page >= total_pages:
+        # Rooms were deleted since the page was chosen; step back to the last page
+        st.session_state.rooms_page = max(total_pages - 1, 0)
+        st.rerun()
+    if user_role == ROLE_ADMIN and total_rooms:
+        st.caption(f"{total_rooms} rooms")
+
+    if not all_rooms and user_role == ROLE_STUDENT:
         st.info("You have not been assigned a room yet.")
     elif not all_rooms:
         st.info("No rooms found.")
     else:
-        cols = st.columns([1,1,1,1,2,2] if st.session_state.user['role'] == 'admin' else [1,1,1,1])
-        headers = ["Number", "Type", "Block", "Status"]
-        if st.session_state.user['role'] == 'admin':
-            headers.extend(["Assigned To", "Actions"])
-
-        for col, header_text in zip(cols, headers):
-            col.markdown(f"**{header_text}**")
-
+        # One table message per render instead of a row of widgets per room
+        rows = []
         for room in all_rooms:
-            cols = st.columns([1,1,1,1,2,2] if st.session_state.user['role'] == 'admin' else [1,1,1,1])
-            cols[0].write(room['number'])
-            cols[1].write(room['roomType'])
-            cols[2].write(room['hostelBlock'])
-            cols[3].write(room['status'])
-
-            if st.session_state.user['role'] == 'admin':
-                assigned_user_info = "N/A"
-                if room.get('userId'):
-                    user_assigned = users_collection.find_one({"_id": room['userId']})
-                    if user_assigned:
-                        assigned_user_info = f"{user_assigned['name']} ({user_assigned['userId']})"
-                cols[4].write(assigned_user_info)
-
-                action_placeholder = cols[5].empty()  # For buttons
-                if action_placeholder.button("Edit", key=f"edit_room_{room['_id']}", type="secondary"):
-                    st.session_state.editing_room_id = str(room['_id'])
-                    st.rerun()
+            row = {"Number": room['number'], "Type": room['roomType'], "Block": room['hostelBlock'], "Status": room['status']}
+            if user_role == ROLE_ADMIN:
+                row["Assigned To"] = f"{room['assignedUserName']} ({room['assignedUserCustomId']})" if room.get('assignedUserName') else "N/A"
+            rows.append(row)
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+        if user_role == ROLE_ADMIN:
+            render_pager("rooms_page", page + 1 < total_pages)
+            # Actions are rendered only for the selected room
+            rooms_by_number = {room['number']: room for room in all_rooms}
+            selected_number = st.selectbox("Select Room", options=list(rooms_by_number), key="selected_room_number")
+            room = rooms_by_number[selected_number]
+            action_cols = st.columns(3)
+
+            if action_cols[0].button("Edit", key=f"edit_room_{room['_id']}", type="secondary"):
+                st.session_state.editing_room_id = str(room['_id'])
+                st.rerun()
 
-                if room['status'] == 'occupied':
-                    if action_placeholder.button("Unassign", key=f"unassign_{room['_id']}", type="secondary"):
-                        try:
-                            rooms_collection.update_one(
-                                {"_id": room['_id']},
-                                {"$set": {"userId": None, "status": "available"}}
-                            )
-                            st.toast(f"Room {room['number']} unassigned.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Failed to unassign room: {str(e)}")
+            if room['status'] == STATUS_OCCUPIED:
+                if action_cols[1].button("Unassign", key=f"unassign_{room['_id']}", type="secondary"):
+                    try:
+                        rooms_collection.update_one(
+                            {"_id": room['_id']},
+                            {"$set": {"userId": None, "assignedUserName": None, "assignedUserCustomId": None, "status": STATUS_AVAILABLE}}
+                        )
+                        fetch_rooms.clear()
+                        st.toast(f"Room {room['number']} unassigned.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Failed to unassign room: {str(e)}")
 
-                if action_placeholder.button("Delete", key=f"delete_room_{room['_id']}", type="primary"):
-                    if room['status'] == 'occupied':
-                        st.warning("Cannot delete occupied room. Unassign user first.")
-                    else:
-                        try:
-                            rooms_collection.delete_one({"_id": room['_id']})
-                            st.toast(f"Room {room['number']} deleted.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Failed to delete room: {str(e)}")
+            if action_cols[2].button("Delete", key=f"delete_room_{room['_id']}", type="primary"):
+                if room['status'] == STATUS_OCCUPIED:
+                    st.warning("Cannot delete occupied room. Unassign user first.")
+                else:
+                    try:
+                        rooms_collection.delete_one({"_id": room['_id']})
+                        fetch_rooms.clear()
+                        st.toast(f"Room {room['number']} deleted.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Failed to delete room: {str(e)}")
 
         # Edit form for Room
         if 'editing_room_id' in st.session_state and st.session_state.editing_room_id:
             try:
-                room_to_edit = rooms_collection.find_one({"_id": ObjectId(st.session_state.editing_room_id)})
+                room_to_edit = rooms_collection.find_one({"_id": ObjectId(st.session_state.editing_room_id)}, ROOM_FIELDS)
                 if room_to_edit:
                     st.markdown("---")
                     st.subheader(f"Edit Room: {room_to_edit['number']}")
                     with st.form(f"edit_room_form_{room_to_edit['_id']}", clear_on_submit=True):
                         current_user_obj_id = room_to_edit.get('userId')
-                        current_user_custom_id = ""
-                        if current_user_obj_id:
-                            user_doc = users_collection.find_one({"_id": current_user_obj_id})
+                        current_user_custom_id = room_to_edit.get('assignedUserCustomId') or ""
+                        if current_user_obj_id and not current_user_custom_id:
+                            user_doc = users_collection.find_one({"_id": current_user_obj_id}, {"userId": 1})
                             if user_doc:
                                 current_user_custom_id = user_doc['userId']
 
                         new_number = st.text_input("Room Number", value=room_to_edit['number'])
-                        new_room_type = st.selectbox("Room Type", ["single", "double", "triple"], index=["single", "double", "triple"].index(room_to_edit['roomType']))
-                        new_hostel_block = st.selectbox("Hostel Block", ["Block A", "Block B", "Block C"], index=["Block A", "Block B", "Block C"].index(room_to_edit['hostelBlock']))
+                        new_room_type = st.selectbox("Room Type", ROOM_TYPES, index=ROOM_TYPE_INDEX[room_to_edit['roomType']])
+                        new_hostel_block = st.selectbox("Hostel Block", HOSTEL_BLOCKS, index=HOSTEL_BLOCK_INDEX[room_to_edit['hostelBlock']])
                         new_assign_user_id_str = st.text_input("Assign to User's Custom ID (Optional)", value=current_user_custom_id)
 
                         save_changes = st.form_submit_button("Save Changes")
@@ -289,39 +406,45 @@ def display_room_management():
                         if save_changes:
                             try:
                                 updated_user_mongo_id = None
-                                new_status = "available"
+                                updated_user_name = None
+                                updated_user_custom_id = None
+                                new_status = STATUS_AVAILABLE
+
+                                if new_assign_user_id_str:
+                                    user_to_assign_new = users_collection.find_one({"userId": new_assign_user_id_str}, {"name": 1, "userId": 1})
+                                    if not user_to_assign_new:
+                                        st.error(f"User with custom ID '{new_assign_user_id_str}' not found.")
+                                    else:
+                                        existing_room_for_new_user = rooms_collection.find_one({"userId": user_to_assign_new['_id'], "_id": {"$ne": room_to_edit['_id']}}, {"number": 1})
+                                        if existing_room_for_new_user:
+                                            st.error(f"User {user_to_assign_new['name']} is already assigned to room {existing_room_for_new_user['number']}.")
+                                        else:
+                                            updated_user_mongo_id = user_to_assign_new['_id']
+                                            updated_user_name = user_to_assign_new['name']
+                                            updated_user_custom_id = user_to_assign_new['userId']
+                                            new_status = STATUS_OCCUPIED
 
-                                if new_number != room_to_edit['number'] and rooms_collection.find_one({"number": new_number}):
-                                    st.error(f"Room number '{new_number}' already exists.")
+                                if new_assign_user_id_str and not updated_user_mongo_id and (not current_user_obj_id or (current_user_obj_id and users_collection.count_documents({"_id": current_user_obj_id, "userId": new_assign_user_id_str}, limit=1) == 0)):
+                                    pass
                                 else:
-                                    if new_assign_user_id_str:
-                                        user_to_assign_new = users_collection.find_one({"userId": new_assign_user_id_str})
-                                        if not user_to_assign_new:
-                                            st.error(f"User with custom ID '{new_assign_user_id_str}' not found.")
-                                        else:
-                                            existing_room_for_new_user = rooms_collection.find_one({"userId": user_to_assign_new['_id'], "_id": {"$ne": room_to_edit['_id']}})
-                                            if existing_room_for_new_user:
-                                                st.error(f"User {user_to_assign_new['name']} is already assigned to room {existing_room_for_new_user['number']}.")
-                                            else:
-                                                updated_user_mongo_id = user_to_assign_new['_id']
-                                                new_status = "occupied"
-
-                                    if new_assign_user_id_str and not updated_user_mongo_id and (not current_user_obj_id or (current_user_obj_id and users_collection.find_one({"_id": current_user_obj_id, "userId": new_assign_user_id_str}) is None)):
-                                        pass
-                                    else:
-                                        rooms_collection.update_one(
-                                            {"_id": room_to_edit['_id']},
-                                            {"$set": {
-                                                "number": new_number,
-                                                "roomType": new_room_type,
-                                                "hostelBlock": new_hostel_block,
-                                                "userId": updated_user_mongo_id,
-                                                "status": new_status
-                                            }}
-                                        )
-                                        st.success(f"Room {new_number} updated.")
-                                        del st.session_state.editing_room_id
-                                        st.rerun()
+                                    rooms_collection.update_one(
+                                        {"_id": room_to_edit['_id']},
+                                        {"$set": {
+                                            "number": new_number,
+                                            "roomType": new_room_type,
+                                            "hostelBlock": new_hostel_block,
+                                            "userId": updated_user_mongo_id,
+                                            "assignedUserName": updated_user_name,
+                                            "assignedUserCustomId": updated_user_custom_id,
+                                            "status": new_status
+                                        }}
+                                    )
+                                    fetch_rooms.clear()
+                                    st.success(f"Room {new_number} updated.")
+                                    del st.session_state.editing_room_id
+                                    st.rerun()
+                            except pymongo.errors.DuplicateKeyError:
+                                st.error(f"Room number '{new_number}' already exists.")
                             except Exception as e:
                                 st.error(f"Failed to update room: {str(e)}")
                         if cancel_edit:
@@ -335,18 +458,17 @@ def display_room_requests():
     st.subheader("Room Requests")
     req_collection = get_room_requests_collection()
     rooms_collection = get_rooms_collection()
-    users_collection = get_users_collection()
-    current_user_id = ObjectId(st.session_state.user['_id'])
+    current_user_id = st.session_state.user_oid
+    user_role = st.session_state.user['role']
 
-    if st.session_state.user['role'] == 'student':
+    if user_role == ROLE_STUDENT:
         # Check if student already has a room
-        if rooms_collection.find_one({"userId": current_user_id}):
+        if rooms_collection.count_documents({"userId": current_user_id}, limit=1):
             st.info("You already have a room assigned.")
             return
 
         # Check for existing pending request
-        existing_request = req_collection.find_one({"userId": current_user_id, "status": "pending"})
-        if existing_request:
+        if req_collection.count_documents({"userId": current_user_id, "status": "pending"}, limit=1):
             st.info("You have a pending room request.")
         else:
             if st.button("Request a Room"):
@@ -354,22 +476,33 @@ def display_room_requests():
                     req_collection.insert_one({
                         "userId": current_user_id,
                         "status": "pending",
-                        "requestedAt": datetime.utcnow()
+                        "requestedAt": datetime.now(timezone.utc)
                     })
+                    fetch_pending_requests.clear()
                     st.success("Room request submitted.")
                     st.rerun()
                 except Exception as e:
                     st.error(f"Failed to submit room request: {str(e)}")
 
-        my_requests = list(req_collection.find({"userId": current_user_id}).sort("requestedAt", -1))
+        my_requests = list(req_collection.aggregate([
+            {"$match": {"userId": current_user_id}},
+            {"$sort": {"requestedAt": -1}},
+            {"$limit": LIST_PAGE_SIZE},
+            {"$project": {
+                "status": 1,
+                "requestedAtStr": {"$dateToString": {"format": "%Y-%m-%d %H:%M", "date": "$requestedAt"}}
+            }}
+        ]))
         if my_requests:
             st.write("My Room Requests:")
             for req in my_requests:
-                st.write(f"- Status: {req['status'].capitalize()} (Requested: {req['requestedAt'].strftime('%Y-%m-%d %H:%M')})")
+                st.write(f"- Status: {req['status'].capitalize()} (Requested: {req['requestedAtStr']})")
 
-    elif st.session_state.user['role'] == 'admin':
+    elif user_role == ROLE_ADMIN:
         st.write("Pending Room Requests:")
-        pending_requests = list(req_collection.find({"status": "pending"}))
+        if 'pending_requests_limit' not in st.session_state:
+            st.session_state.pending_requests_limit = LIST_PAGE_SIZE
+        pending_requests = fetch_pending_requests(st.session_state.pending_requests_limit)
         if not pending_requests:
             st.info("No pending room requests.")
             return
@@ -378,17 +511,27 @@ def display_room_requests():
         if 'active_request_id' not in st.session_state:
             st.session_state.active_request_id = None
 
+        users_map = get_users_map(req['userId'] for req in pending_requests)
+        # Users from the pending list who already hold a room, fetched in one query
+        users_with_rooms = {r['userId'] for r in rooms_collection.find({"userId": {"$in": list(users_map)}}, {"userId": 1})}
+        # Rooms offered in the approval form, read once rather than per request
+        available_rooms = []
+        room_options = {}
+        if st.session_state.active_request_id:
+            available_rooms = list(rooms_collection.find({"status": STATUS_AVAILABLE}, {"number": 1, "roomType": 1, "hostelBlock": 1}).sort("number"))
+            room_options = {f"{r['number']} ({r['roomType']}, {r['hostelBlock']})": str(r['_id']) for r in available_rooms}
         for req in pending_requests:
-            user_requesting = users_collection.find_one({"_id": req['userId']})
+            user_requesting = users_map.get(req['userId'])
             if user_requesting:
                 st.markdown(f"**Request from: {user_requesting['name']} ({user_requesting['userId']})**")
 
                 # Check if user already assigned a room
-                if rooms_collection.find_one({"userId": req['userId']}):
+                if req['userId'] in users_with_rooms:
                     st.warning(f"User {user_requesting['name']} already has a room. This request should be rejected or investigated.")
                     if st.button("Reject Invalid Request", key=f"reject_invalid_{req['_id']}", type="primary"):
                         try:
                             req_collection.update_one({"_id": req['_id']}, {"$set": {"status": "rejected"}})
+                            fetch_pending_requests.clear()
                             st.toast("Request rejected.")
                             st.rerun()
                         except Exception as e:
@@ -402,65 +545,80 @@ def display_room_requests():
                 # Show form for the active request
                 if st.session_state.active_request_id == str(req['_id']):
                     with st.expander(f"Assign Room for: {user_requesting['name']}", expanded=True):
-                        available_rooms = list(rooms_collection.find({"status": "available"}))
-                        if not available_rooms:
-                            st.warning("No available rooms to assign.")
-                            if st.button("Reject (No Rooms)", key=f"reject_no_room_{req['_id']}"):
-                                try:
-                                    req_collection.update_one({"_id": req['_id']}, {"$set": {"status": "rejected"}})
-                                    st.session_state.active_request_id = None
-                                    st.toast("Request rejected.")
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Failed to reject request: {str(e)}")
-                            if st.button("Cancel", key=f"cancel_approve_{req['_id']}"):
-                                st.session_state.active_request_id = None
-                                st.rerun()
-                        else:
-                            room_options = {f"{r['number']} ({r['roomType']}, {r['hostelBlock']})": str(r['_id']) for r in available_rooms}
-                            selected_room_id_str = st.selectbox("Select Room to Assign", options=room_options.keys(), key=f"room_select_{req['_id']}")
+                        # Controls live in a form so only a submit triggers a rerun
+                        with st.form(f"approve_form_{req['_id']}"):
+                            if not available_rooms:
+                                st.warning("No available rooms to assign.")
+                                action_cols = st.columns(2)
+                                reject = action_cols[0].form_submit_button("Reject (No Rooms)")
+                                cancel = action_cols[1].form_submit_button("Cancel")
+                                approve = False
+                            else:
+                                selected_room_id_str = st.selectbox("Select Room to Assign", options=room_options.keys(), key=f"room_select_{req['_id']}")
+                                action_cols = st.columns(3)
+                                approve = action_cols[0].form_submit_button("Approve and Assign")
+                                reject = action_cols[1].form_submit_button("Reject Request", type="primary")
+                                cancel = action_cols[2].form_submit_button("Cancel")
 
-                            if st.button("Approve and Assign", key=f"approve_{req['_id']}"):
+                            if approve:
                                 try:
                                     room_id_to_assign = ObjectId(room_options[selected_room_id_str])
-                                    rooms_collection.update_one(
-                                        {"_id": room_id_to_assign},
-                                        {"$set": {"userId": req['userId'], "status": "occupied"}}
-                                    )
-                                    req_collection.update_one(
-                                        {"_id": req['_id']},
-                                        {"$set": {"status": "approved", "assignedRoomId": room_id_to_assign}}
-                                    )
+
+                                    # Room assignment and request approval succeed or fail together
+                                    def assign_room(session):
+                                        rooms_collection.update_one(
+                                            {"_id": room_id_to_assign},
+                                            {"$set": {
+                                                "userId": req['userId'],
+                                                "assignedUserName": user_requesting['name'],
+                                                "assignedUserCustomId": user_requesting['userId'],
+                                                "status": STATUS_OCCUPIED
+                                            }},
+                                            session=session
+                                        )
+                                        req_collection.update_one(
+                                            {"_id": req['_id']},
+                                            {"$set": {"status": "approved", "assignedRoomId": room_id_to_assign}},
+                                            session=session
+                                        )
+                                    db_connection.run_transaction(assign_room)
+                                    fetch_rooms.clear()
+                                    fetch_pending_requests.clear()
                                     st.session_state.active_request_id = None
                                     st.success(f"Room assigned to {user_requesting['name']}.")
                                     st.rerun()
                                 except Exception as e:
                                     st.error(f"Failed to assign room: {str(e)}")
 
-                            if st.button("Reject Request", key=f"reject_{req['_id']}", type="primary"):
+                            if reject:
                                 try:
                                     req_collection.update_one({"_id": req['_id']}, {"$set": {"status": "rejected"}})
+                                    fetch_pending_requests.clear()
                                     st.session_state.active_request_id = None
                                     st.toast("Request rejected.")
                                     st.rerun()
                                 except Exception as e:
                                     st.error(f"Failed to reject request: {str(e)}")
 
-                            if st.button("Cancel", key=f"cancel_dialog_{req['_id']}"):
+                            if cancel:
                                 st.session_state.active_request_id = None
                                 st.rerun()
                 st.markdown("---")
 
+        if len(pending_requests) == st.session_state.pending_requests_limit:
+            if st.button("Load more requests"):
+                st.session_state.pending_requests_limit += LIST_PAGE_SIZE
+                st.rerun()
+
 # --- Maintenance UI & Logic ---
 def display_maintenance_requests():
     st.subheader("Maintenance Requests")
     maint_collection = get_maintenance_collection()
-    users_collection = get_users_collection()
-    current_user_id = ObjectId(st.session_state.user['_id'])
+    current_user_id = st.session_state.user_oid
     user_role = st.session_state.user['role']
 
     # Submit new request form
-    if user_role == 'student' or user_role == 'staff':
+    if user_role in MAINTENANCE_SUBMIT_ROLES:
         with st.expander("Submit New Maintenance Request", expanded=False):
             with st.form("new_maint_req_form", clear_on_submit=True):
                 description = st.text_area("Describe the issue")
@@ -472,8 +630,9 @@ def display_maintenance_requests():
                             "description": description,
                             "status": "Pending",
                             "assignedStaff": None,
-                            "createdAt": datetime.utcnow()
+                            "createdAt": datetime.now(timezone.utc)
                         })
+                        fetch_maintenance.clear()
                         st.success("Maintenance request submitted.")
                         st.rerun()
                     except Exception as e:
@@ -484,12 +643,10 @@ def display_maintenance_requests():
     st.markdown("---")
     st.write("**Existing Maintenance Requests:**")
 
-    query = {}
-    if user_role == 'student':
-        query = {"userId": current_user_id}
-
+    if 'maint_limit' not in st.session_state:
+        st.session_state.maint_limit = LIST_PAGE_SIZE
     try:
-        all_requests = list(maint_collection.find(query).sort("createdAt", -1))
+        all_requests = fetch_maintenance(user_role, st.session_state.user['_id'], st.session_state.maint_limit)
     except Exception as e:
         st.error(f"Failed to fetch maintenance requests: {str(e)}")
         return
@@ -497,48 +654,61 @@ def display_maintenance_requests():
     if not all_requests:
         st.info("No maintenance requests found.")
     else:
+        users_map = get_users_map(req['userId'] for req in all_requests)
+        rows = []
         for req in all_requests:
-            user_who_requested = users_collection.find_one({"_id": req['userId']})
-            requested_by_info = f"{user_who_requested['name']} ({user_who_requested['userId']})" if user_who_requested else "Unknown User"
-
-            card_cols = st.columns([3,2,2])
-            with card_cols[0]:
-                st.markdown(f"**Description:** {req['description']}")
-                st.caption(f"Requested on: {req['createdAt'].strftime('%Y-%m-%d %H:%M')}")
-            with card_cols[1]:
-                st.markdown(f"**Requested by:** {requested_by_info}")
-
-            with card_cols[2]:
-                current_status = req['status']
-                st.markdown(f"**Status:** {current_status}")
-
-                if user_role == 'admin' or user_role == 'staff':
-                    new_status = st.selectbox(
-                        "Update Status",
-                        options=["Pending", "In Progress", "Completed"],
-                        index=["Pending", "In Progress", "Completed"].index(current_status),
-                        key=f"status_maint_{req['_id']}"
+            user_who_requested = users_map.get(req['userId'])
+            rows.append({
+                "Description": req['description'],
+                "Requested by": f"{user_who_requested['name']} ({user_who_requested['userId']})" if user_who_requested else "Unknown User",
+                "Requested on": req['createdAtStr'],
+                "Status": req['status']
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+        if len(all_requests) == st.session_state.maint_limit:
+            if st.button("Load more requests"):
+                st.session_state.maint_limit += LIST_PAGE_SIZE
+                st.rerun()
+
+        if user_role in MAINTENANCE_MANAGE_ROLES:
+            # Status/delete controls are rendered only for the selected request
+            requests_by_id = {str(req['_id']): req for req in all_requests}
+            selected_req_id = st.selectbox(
+                "Select Request",
+                options=list(requests_by_id),
+                format_func=lambda req_id: f"{requests_by_id[req_id]['createdAtStr']} - {requests_by_id[req_id]['description'][:50]}",
+                key="selected_maint_req"
+            )
+            req = requests_by_id[selected_req_id]
+            current_status = req['status']
+            new_status = st.selectbox(
+                "Update Status",
+                options=MAINTENANCE_STATUSES,
+                index=MAINTENANCE_STATUS_INDEX[current_status],
+                key=f"status_maint_{req['_id']}"
+            )
+            if new_status != current_status:
+                try:
+                    maint_collection.update_one(
+                        {"_id": req['_id']},
+                        {"$set": {"status": new_status}}
                     )
-                    if new_status != current_status:
-                        try:
-                            maint_collection.update_one(
-                                {"_id": req['_id']},
-                                {"$set": {"status": new_status}}
-                            )
-                            st.toast(f"Request status updated to {new_status}.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Failed to update request status: {str(e)}")
+                    fetch_maintenance.clear()
+                    st.toast(f"Request status updated to {new_status}.")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Failed to update request status: {str(e)}")
 
-                    if user_role == 'admin':
-                        if st.button("Delete Request", key=f"del_maint_{req['_id']}", type="primary"):
-                            try:
-                                maint_collection.delete_one({"_id": req['_id']})
-                                st.toast("Maintenance request deleted.")
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Failed to delete request: {str(e)}")
-            st.markdown("---")
+            if user_role == ROLE_ADMIN:
+                if st.button("Delete Request", key=f"del_maint_{req['_id']}", type="primary"):
+                    try:
+                        maint_collection.delete_one({"_id": req['_id']})
+                        fetch_maintenance.clear()
+                        st.toast("Maintenance request deleted.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Failed to delete request: {str(e)}")
 
 # --- Event Management (Admin Creates, All View) ---
 def display_events():
@@ -546,7 +716,7 @@ def display_events():
     events_collection = get_events_collection()
     user_role = st.session_state.user['role']
 
-    if user_role == 'admin':
+    if user_role == ROLE_ADMIN:
         with st.expander("Add New Event", expanded=False):
             with st.form("new_event_form", clear_on_submit=True):
                 title = st.text_input("Event Title")
@@ -555,12 +725,13 @@ def display_events():
 
                 if submit_event and title and event_date_input:
                     try:
-                        event_datetime = datetime.combine(event_date_input, datetime.min.time())
+                        event_datetime = datetime.combine(event_date_input, _MIDNIGHT)
                         events_collection.insert_one({
                             "title": title,
                             "date": event_datetime,
-                            "createdAt": datetime.utcnow()
+                            "createdAt": datetime.now(timezone.utc)
                         })
+                        fetch_events.clear()
                         st.success(f"Event '{title}' added.")
                         st.rerun()
                     except Exception as e:
@@ -571,72 +742,113 @@ def display_events():
     st.markdown("---")
     st.write("**Upcoming & Past Events:**")
     try:
-        all_events = list(events_collection.find().sort("date", -1))
+        upcoming_events, past_events = fetch_events(datetime.combine(date.today(), _MIDNIGHT))
     except Exception as e:
         st.error(f"Failed to fetch events: {str(e)}")
         return
 
+    all_events = upcoming_events + past_events
     if not all_events:
         st.info("No events scheduled.")
     else:
-        if 'active_event_id' not in st.session_state:
-            st.session_state.active_event_id = None
-
-        for event in all_events:
-            st.markdown(f"#### {event['title']}")
-            st.caption(f"Date: {event['date'].strftime('%Y-%m-%d')}")
-            if user_role == 'admin':
-                if st.button("Edit", key=f"edit_event_btn_{event['_id']}", type="secondary"):
-                    st.session_state.active_event_id = str(event['_id'])
-                    st.rerun()
+        if upcoming_events:
+            st.dataframe(
+                [{"Title": event['title'], "Date": event['date'].strftime('%Y-%m-%d')} for event in upcoming_events],
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No upcoming events.")
+        if past_events:
+            with st.expander(f"Recent Past Events (last {EVENTS_PAGE_SIZE})", expanded=False):
+                st.dataframe(
+                    [{"Title": event['title'], "Date": event['date'].strftime('%Y-%m-%d')} for event in past_events],
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+        if user_role == ROLE_ADMIN:
+            if 'active_event_id' not in st.session_state:
+                st.session_state.active_event_id = None
+
+            # Edit/delete controls are rendered only for the selected event
+            events_by_id = {str(event['_id']): event for event in all_events}
+            selected_event_id = st.selectbox(
+                "Select Event",
+                options=list(events_by_id),
+                format_func=lambda event_id: f"{events_by_id[event_id]['date'].strftime('%Y-%m-%d')} - {events_by_id[event_id]['title']}",
+                key="selected_event"
+            )
+            event = events_by_id[selected_event_id]
+            action_cols = st.columns(2)
+
+            if action_cols[0].button("Edit", key=f"edit_event_btn_{event['_id']}", type="secondary"):
+                st.session_state.active_event_id = str(event['_id'])
+                st.rerun()
 
-                if st.session_state.active_event_id == str(event['_id']):
-                    with st.expander(f"Edit Event: {event['title']}", expanded=True):
-                        new_title = st.text_input("Event Title", value=event['title'], key=f"edit_title_{event['_id']}")
-                        new_date_input = st.date_input("Event Date", value=event['date'].date(), key=f"edit_date_{event['_id']}")
+            if action_cols[1].button("Delete Event", key=f"del_event_{event['_id']}", type="primary"):
+                try:
+                    events_collection.delete_one({"_id": event['_id']})
+                    fetch_events.clear()
+                    st.toast(f"Event '{event['title']}' deleted.")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Failed to delete event: {str(e)}")
 
-                        if st.button("Save Changes", key=f"save_event_{event['_id']}"):
-                            if new_title and new_date_input:
-                                try:
-                                    new_event_datetime = datetime.combine(new_date_input, datetime.min.time())
-                                    events_collection.update_one(
-                                        {"_id": event['_id']},
-                                        {"$set": {"title": new_title, "date": new_event_datetime}}
-                                    )
-                                    st.session_state.active_event_id = None
-                                    st.success("Event updated.")
-                                    st.rerun()
-                                except Exception as e:
-                                    st.error(f"Failed to update event: {str(e)}")
-                            else:
-                                st.error("Title and date are required.")
+            if st.session_state.active_event_id == str(event['_id']):
+                with st.expander(f"Edit Event: {event['title']}", expanded=True):
+                    new_title = st.text_input("Event Title", value=event['title'], key=f"edit_title_{event['_id']}")
+                    new_date_input = st.date_input("Event Date", value=event['date'].date(), key=f"edit_date_{event['_id']}")
 
-                        if st.button("Cancel", key=f"cancel_edit_event_{event['_id']}"):
-                            st.session_state.active_event_id = None
-                            st.rerun()
+                    if st.button("Save Changes", key=f"save_event_{event['_id']}"):
+                        if new_title and new_date_input:
+                            try:
+                                new_event_datetime = datetime.combine(new_date_input, _MIDNIGHT)
+                                events_collection.update_one(
+                                    {"_id": event['_id']},
+                                    {"$set": {"title": new_title, "date": new_event_datetime}}
+                                )
+                                fetch_events.clear()
+                                st.session_state.active_event_id = None
+                                st.success("Event updated.")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Failed to update event: {str(e)}")
+                        else:
+                            st.error("Title and date are required.")
 
-                if st.button("Delete Event", key=f"del_event_{event['_id']}", type="primary"):
-                    try:
-                        events_collection.delete_one({"_id": event['_id']})
-                        st.toast(f"Event '{event['title']}' deleted.")
+                    if st.button("Cancel", key=f"cancel_edit_event_{event['_id']}"):
+                        st.session_state.active_event_id = None
                         st.rerun()
-                    except Exception as e:
-                        st.error(f"Failed to delete event: {str(e)}")
-            st.markdown("---")
 
 # --- Fee Management (Admin Creates/Manages, Student Views) ---
+# Table row builders, picked once per render by role
+def _fee_row_admin(fee):
+    student_user = fee.get('student')
+    return {
+        "Student": f"{student_user['name']} ({student_user['userId']})" if student_user else "N/A",
+        "Amount": f"${fee['amount']:.2f}",
+        "Due": fee['dueDate'].strftime('%Y-%m-%d'),
+        "Status": fee['status']
+    }
+
+def _fee_row_student(fee):
+    return {
+        "Amount": f"${fee['amount']:.2f}",
+        "Due": fee['dueDate'].strftime('%Y-%m-%d'),
+        "Status": fee['status']
+    }
+
 def display_fees():
     st.subheader("Fee Management")
     fees_collection = get_fees_collection()
-    users_collection = get_users_collection()
     user_role = st.session_state.user['role']
-    current_user_id = ObjectId(st.session_state.user['_id'])
+    current_user_id = st.session_state.user_oid
 
-    if user_role == 'admin':
+    if user_role == ROLE_ADMIN:
         with st.expander("Add New Fee Record", expanded=False):
             with st.form("new_fee_form", clear_on_submit=True):
-                all_users = list(users_collection.find({"role": "student"}, {"userId": 1, "name": 1, "_id": 1}))
-                user_options = {f"{u['name']} ({u['userId']})": str(u['_id']) for u in all_users}
+                user_options = fetch_student_options()
 
                 selected_user_display = st.selectbox("Select Student", options=user_options.keys())
                 amount = st.number_input("Amount ($)", min_value=0.01, step=0.01)
@@ -647,13 +859,13 @@ def display_fees():
                 if submit_fee and selected_user_display and amount and due_date_input:
                     try:
                         student_mongo_id = ObjectId(user_options[selected_user_display])
-                        due_datetime = datetime.combine(due_date_input, datetime.min.time())
+                        due_datetime = datetime.combine(due_date_input, _MIDNIGHT)
                         fees_collection.insert_one({
                             "userId": student_mongo_id,
                             "amount": amount,
                             "dueDate": due_datetime,
                             "status": initial_status,
-                            "createdAt": datetime.utcnow()
+                            "createdAt": datetime.now(timezone.utc)
                         })
                         st.success("Fee record added.")
                         st.rerun()
@@ -666,11 +878,14 @@ def display_fees():
     st.write("**Fee Records:**")
 
     query = {}
-    if user_role == 'student':
+    if user_role == ROLE_STUDENT:
         query = {"userId": current_user_id}
 
     try:
-        all_fees = list(fees_collection.find(query).sort("dueDate", 1))
+        all_fees, has_next_fees = fetch_joined_page(
+            fees_collection, query, {"dueDate": 1},
+            {"userId": 1, "amount": 1, "dueDate": 1, "status": 1}, "userId", "fees_page"
+        )
     except Exception as e:
         st.error(f"Failed to fetch fee records: {str(e)}")
         return
@@ -678,56 +893,85 @@ def display_fees():
     if not all_fees:
         st.info("No fee records found.")
     else:
-        for fee in all_fees:
-            student_user = users_collection.find_one({"_id": fee['userId']})
-            student_info = f"{student_user['name']} ({student_user['userId']})" if student_user else "N/A"
-
-            fee_cols = st.columns([2,1,1,1,2] if user_role == 'admin' else [2,1,1,1])
-            with fee_cols[0]:
-                st.markdown(f"**Student:** {student_info}" if user_role == 'admin' else f"**Amount:** ${fee['amount']:.2f}")
-            with fee_cols[1 if user_role == 'admin' else 0]:
-                st.markdown(f"**Amount:** ${fee['amount']:.2f}" if user_role == 'admin' else f"**Due:** {fee['dueDate'].strftime('%Y-%m-%d')}")
-            with fee_cols[2 if user_role == 'admin' else 1]:
-                st.markdown(f"**Due:** {fee['dueDate'].strftime('%Y-%m-%d')}" if user_role == 'admin' else f"**Status:** {fee['status']}")
-            with fee_cols[3 if user_role == 'admin' else 2]:
-                current_fee_status = fee['status']
-                st.markdown(f"**Status:** {current_fee_status}")
-
-            if user_role == 'admin':
-                with fee_cols[4]:
-                    new_fee_status = st.selectbox(
-                        "Update Status",
-                        options=["Pending", "Paid"],
-                        index=["Pending", "Paid"].index(current_fee_status),
-                        key=f"status_fee_{fee['_id']}"
-                    )
-                    if new_fee_status != current_fee_status:
-                        try:
-                            fees_collection.update_one(
-                                {"_id": fee['_id']},
-                                {"$set": {"status": new_fee_status}}
-                            )
-                            st.toast(f"Fee status updated to {new_fee_status}.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Failed to update fee status: {str(e)}")
+        fee_row = _fee_row_admin if user_role == ROLE_ADMIN else _fee_row_student
+        rows = [fee_row(fee) for fee in all_fees]
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+        if user_role == ROLE_ADMIN:
+            fee_labels = {str(fee['_id']): f"{row['Student']} - {row['Amount']} due {row['Due']}"
+                          for fee, row in zip(all_fees, rows)}
+            # Status/delete controls are rendered only for the selected fee record
+            fees_by_id = {str(fee['_id']): fee for fee in all_fees}
+            selected_fee_id = st.selectbox("Select Fee Record", options=list(fees_by_id), format_func=fee_labels.get, key="selected_fee")
+            fee = fees_by_id[selected_fee_id]
+            current_fee_status = fee['status']
+            # Status changes are queued per fee id and written together on commit
+            pending_fee_ops = st.session_state.setdefault('pending_fee_ops', {})
+            new_fee_status = st.selectbox(
+                "Update Status",
+                options=["Pending", "Paid"],
+                index=["Pending", "Paid"].index(pending_fee_ops.get(selected_fee_id, current_fee_status)),
+                key=f"status_fee_{fee['_id']}"
+            )
+            if new_fee_status != current_fee_status:
+                pending_fee_ops[selected_fee_id] = new_fee_status
+            else:
+                pending_fee_ops.pop(selected_fee_id, None)
 
-                    if st.button("Delete Fee", key=f"del_fee_{fee['_id']}", type="primary"):
-                        try:
-                            fees_collection.delete_one({"_id": fee['_id']})
-                            st.toast("Fee record deleted.")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Failed to delete fee record: {str(e)}")
-            st.markdown("---")
+            if pending_fee_ops:
+                commit_cols = st.columns(2)
+                if commit_cols[0].button(f"Commit {len(pending_fee_ops)} changes", key="commit_fee_ops", type="primary"):
+                    try:
+                        fees_collection.bulk_write(
+                            [UpdateOne({"_id": ObjectId(fee_id)}, {"$set": {"status": status}})
+                             for fee_id, status in pending_fee_ops.items()],
+                            ordered=False
+                        )
+                        st.toast(f"{len(pending_fee_ops)} fee status change(s) saved.")
+                        pending_fee_ops.clear()
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Failed to update fee status: {str(e)}")
+                if commit_cols[1].button("Discard changes", key="discard_fee_ops"):
+                    # Reset the status widgets too, or they would re-queue their values
+                    for fee_id in pending_fee_ops:
+                        st.session_state.pop(f"status_fee_{fee_id}", None)
+                    pending_fee_ops.clear()
+                    st.rerun()
+
+            if st.button("Delete Fee", key=f"del_fee_{fee['_id']}", type="primary"):
+                try:
+                    fees_collection.delete_one({"_id": fee['_id']})
+                    st.toast("Fee record deleted.")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Failed to delete fee record: {str(e)}")
+
+    render_pager("fees_page", has_next_fees)
 
 # --- Visitor Management (Student Registers, Staff Approves/Rejects, Admin can also view/manage) ---
+def _decide_visit(visitors_collection, visitor, new_status):
+    # The status only changes while the visit is still pending, so two staff
+    # acting on the same visitor cannot overwrite each other
+    try:
+        result = visitors_collection.update_one(
+            {"_id": visitor['_id'], "status": "Pending"},
+            {"$set": {"status": new_status}}
+        )
+        if result.modified_count:
+            st.toast(f"Visitor '{visitor['name']}' {new_status.lower()}.")
+        else:
+            st.toast(f"Visitor '{visitor['name']}' was already processed.")
+        st.rerun()
+    except Exception as e:
+        st.error(f"Failed to update visitor status: {str(e)}")
+
 def display_visitors():
     st.subheader("Visitor Management")
     visitors_collection = get_visitors_collection()
     user_role = st.session_state.user['role']
 
-    if user_role == 'student':
+    if user_role == ROLE_STUDENT:
         with st.expander("Register New Visitor", expanded=False):
             with st.form("new_visitor_form", clear_on_submit=True):
                 name = st.text_input("Visitor Name")
@@ -738,15 +982,15 @@ def display_visitors():
 
                 if submit_visitor and all([name, contact_number, visit_date_input, purpose]):
                     try:
-                        visit_datetime = datetime.combine(visit_date_input, datetime.min.time())
+                        visit_datetime = datetime.combine(visit_date_input, _MIDNIGHT)
                         visitors_collection.insert_one({
-                            "registeredByStudentId": ObjectId(st.session_state.user['_id']),
+                            "registeredByStudentId": st.session_state.user_oid,
                             "name": name,
                             "contactNumber": contact_number,
                             "visitDate": visit_datetime,
                             "purpose": purpose,
                             "status": "Pending",
-                            "createdAt": datetime.utcnow()
+                            "createdAt": datetime.now(timezone.utc)
                         })
                         st.success("Visitor registration submitted for approval.")
                         st.rerun()
@@ -759,11 +1003,15 @@ def display_visitors():
     st.write("**Visitor Log:**")
 
     query = {}
-    if user_role == 'student':
-        query = {"registeredByStudentId": ObjectId(st.session_state.user['_id'])}
+    if user_role == ROLE_STUDENT:
+        query = {"registeredByStudentId": st.session_state.user_oid}
 
     try:
-        all_visitors = list(visitors_collection.find(query).sort("visitDate", -1))
+        all_visitors, has_next_visitors = fetch_joined_page(
+            visitors_collection, query, {"visitDate": -1},
+            {"name": 1, "contactNumber": 1, "visitDate": 1, "purpose": 1, "status": 1, "registeredByStudentId": 1},
+            "registeredByStudentId", "visitors_page"
+        )
     except Exception as e:
         st.error(f"Failed to fetch visitor records: {str(e)}")
         return
@@ -771,45 +1019,82 @@ def display_visitors():
     if not all_visitors:
         st.info("No visitor records found.")
     else:
+        rows = []
         for visitor in all_visitors:
-            student_who_registered = get_user_by_id_str(str(visitor.get('registeredByStudentId')))
-            registered_by_info = f"{student_who_registered['name']} ({student_who_registered['userId']})" if student_who_registered else "N/A"
-
-            st.markdown(f"#### Visitor: {visitor['name']}")
-            st.write(f"**Contact:** {visitor['contactNumber']}")
-            st.write(f"**Proposed Visit Date:** {visitor['visitDate'].strftime('%Y-%m-%d')}")
-            st.write(f"**Purpose:** {visitor['purpose']}")
-            st.write(f"**Registered by:** {registered_by_info}")
-            current_visitor_status = visitor['status']
-            st.write(f"**Status:** {current_visitor_status}")
-
-            if user_role == 'staff' or user_role == 'admin':
-                if current_visitor_status == "Pending":
-                    action_cols = st.columns(2)
-                    if action_cols[0].button("Approve Visit", key=f"approve_visit_{visitor['_id']}", type="primary"):
+            student_who_registered = visitor.get('student')
+            rows.append({
+                "Visitor": visitor['name'],
+                "Contact": visitor['contactNumber'],
+                "Proposed Visit Date": visitor['visitDate'].strftime('%Y-%m-%d'),
+                "Purpose": visitor['purpose'],
+                "Registered by": f"{student_who_registered['name']} ({student_who_registered['userId']})" if student_who_registered else "N/A",
+                "Status": visitor['status']
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+        if user_role in (ROLE_STAFF, ROLE_ADMIN):
+            # Actions are rendered only for the selected visitor record
+            visitors_by_id = {str(visitor['_id']): visitor for visitor in all_visitors}
+            selected_visitor_id = st.selectbox(
+                "Select Visitor",
+                options=list(visitors_by_id),
+                format_func=lambda visitor_id: f"{visitors_by_id[visitor_id]['name']} ({visitors_by_id[visitor_id]['visitDate'].strftime('%Y-%m-%d')}) - {visitors_by_id[visitor_id]['status']}",
+                key="selected_visitor"
+            )
+            visitor = visitors_by_id[selected_visitor_id]
+            action_cols = st.columns(3)
+
+            if visitor['status'] == "Pending":
+                if action_cols[0].button("Approve Visit", key=f"approve_visit_{visitor['_id']}", type="primary"):
+                    _decide_visit(visitors_collection, visitor, "Approved")
+                if action_cols[1].button("Reject Visit", key=f"reject_visit_{visitor['_id']}", type="secondary"):
+                    _decide_visit(visitors_collection, visitor, "Rejected")
+
+            if user_role == ROLE_ADMIN:
+                if action_cols[2].button("Delete Record", key=f"del_visitor_{visitor['_id']}", type="primary"):
+                    try:
+                        visitors_collection.delete_one({"_id": visitor['_id']})
+                        st.toast(f"Visitor record for '{visitor['name']}' deleted.")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Failed to delete visitor record: {str(e)}")
+
+            # Bulk actions: one write and one rerun for any number of selected records
+            with st.expander("Bulk Actions", expanded=False):
+                with st.form("bulk_visitor_form", clear_on_submit=True):
+                    selected_ids = st.multiselect(
+                        "Select Visitors",
+                        options=list(visitors_by_id),
+                        format_func=lambda visitor_id: f"{visitors_by_id[visitor_id]['name']} ({visitors_by_id[visitor_id]['visitDate'].strftime('%Y-%m-%d')}) - {visitors_by_id[visitor_id]['status']}"
+                    )
+                    bulk_cols = st.columns(3)
+                    approve_selected = bulk_cols[0].form_submit_button("Approve Selected")
+                    reject_selected = bulk_cols[1].form_submit_button("Reject Selected")
+                    delete_selected = bulk_cols[2].form_submit_button("Delete Selected", type="primary") if user_role == ROLE_ADMIN else False
+
+                    if (approve_selected or reject_selected or delete_selected) and not selected_ids:
+                        st.error("Select at least one visitor.")
+                    elif approve_selected or reject_selected:
+                        new_visitor_status = "Approved" if approve_selected else "Rejected"
                         try:
-                            visitors_collection.update_one({"_id": visitor['_id']}, {"$set": {"status": "Approved"}})
-                            st.toast(f"Visitor '{visitor['name']}' approved.")
+                            # Only pending visits can be approved or rejected
+                            result = visitors_collection.update_many(
+                                {"_id": {"$in": [ObjectId(v) for v in selected_ids]}, "status": "Pending"},
+                                {"$set": {"status": new_visitor_status}}
+                            )
+                            st.toast(f"{result.modified_count} visitor(s) {new_visitor_status.lower()}.")
                             st.rerun()
                         except Exception as e:
-                            st.error(f"Failed to approve visitor: {str(e)}")
-                    if action_cols[1].button("Reject Visit", key=f"reject_visit_{visitor['_id']}", type="secondary"):
+                            st.error(f"Failed to update visitors: {str(e)}")
+                    elif delete_selected:
                         try:
-                            visitors_collection.update_one({"_id": visitor['_id']}, {"$set": {"status": "Rejected"}})
-                            st.toast(f"Visitor '{visitor['name']}' rejected.")
+                            result = visitors_collection.delete_many({"_id": {"$in": [ObjectId(v) for v in selected_ids]}})
+                            st.toast(f"{result.deleted_count} visitor record(s) deleted.")
                             st.rerun()
                         except Exception as e:
-                            st.error(f"Failed to reject visitor: {str(e)}")
+                            st.error(f"Failed to delete visitor records: {str(e)}")
 
-            if user_role == 'admin':
-                if st.button("Delete Record", key=f"del_visitor_{visitor['_id']}", type="primary"):
-                    try:
-                        visitors_collection.delete_one({"_id": visitor['_id']})
-                        st.toast(f"Visitor record for '{visitor['name']}' deleted.")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Failed to delete visitor record: {str(e)}")
-            st.markdown("---")
+    render_pager("visitors_page", has_next_visitors)
 
 # --- Feedback (Student Submits, Admin Views) ---
 def display_feedback():
@@ -817,7 +1102,7 @@ def display_feedback():
     feedback_collection = get_feedback_collection()
     user_role = st.session_state.user['role']
 
-    if user_role == 'student':
+    if user_role == ROLE_STUDENT:
         with st.form("new_feedback_form", clear_on_submit=True):
             feedback_text = st.text_area("Your Feedback")
             submit_feedback = st.form_submit_button("Submit Feedback")
@@ -825,9 +1110,9 @@ def display_feedback():
             if submit_feedback and feedback_text:
                 try:
                     feedback_collection.insert_one({
-                        "userId": ObjectId(st.session_state.user['_id']),
+                        "userId": st.session_state.user_oid,
                         "feedback": feedback_text,
-                        "createdAt": datetime.utcnow()
+                        "createdAt": datetime.now(timezone.utc)
                     })
                     st.success("Thank you for your feedback!")
                     st.rerun()
@@ -839,7 +1124,7 @@ def display_feedback():
         st.markdown("---")
         st.write("**My Submitted Feedback:**")
         try:
-            my_feedback = list(feedback_collection.find({"userId": ObjectId(st.session_state.user['_id'])}).sort("createdAt", -1))
+            my_feedback, has_next_feedback = fetch_page(feedback_collection.find({"userId": st.session_state.user_oid}, {"feedback": 1, "createdAt": 1}).sort("createdAt", -1), "feedback_page")
         except Exception as e:
             st.error(f"Failed to fetch feedback: {str(e)}")
             return
@@ -851,11 +1136,12 @@ def display_feedback():
                 st.markdown(f"> {fb['feedback']}")
                 st.caption(f"Submitted on: {fb['createdAt'].strftime('%Y-%m-%d %H:%M')}")
                 st.markdown("---")
+        render_pager("feedback_page", has_next_feedback)
 
-    elif user_role == 'admin':
+    elif user_role == ROLE_ADMIN:
         st.write("**All Submitted Feedback:**")
         try:
-            all_feedback = list(feedback_collection.find().sort("createdAt", -1))
+            all_feedback, has_next_feedback = fetch_page(feedback_collection.find({}, {"userId": 1, "feedback": 1, "createdAt": 1}).sort("createdAt", -1), "feedback_page")
         except Exception as e:
             st.error(f"Failed to fetch feedback: {str(e)}")
             return
@@ -863,13 +1149,17 @@ def display_feedback():
         if not all_feedback:
             st.info("No feedback submitted yet.")
         else:
+            users_map = get_users_map(fb['userId'] for fb in all_feedback)
+            rows = []
             for fb in all_feedback:
-                user_who_submitted = get_user_by_id_str(str(fb['userId']))
-                submitted_by_info = f"{user_who_submitted['name']} ({user_who_submitted['userId']})" if user_who_submitted else "Unknown User"
-                st.markdown(f"**From:** {submitted_by_info}")
-                st.markdown(f"> {fb['feedback']}")
-                st.caption(f"Submitted on: {fb['createdAt'].strftime('%Y-%m-%d %H:%M')}")
-                st.markdown("---")
+                user_who_submitted = users_map.get(fb['userId'])
+                rows.append({
+                    "From": f"{user_who_submitted['name']} ({user_who_submitted['userId']})" if user_who_submitted else "Unknown User",
+                    "Feedback": fb['feedback'],
+                    "Submitted on": fb['createdAt'].strftime('%Y-%m-%d %H:%M')
+                })
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+        render_pager("feedback_page", has_next_feedback)
 
 # --- Main Dashboard and Navigation ---
 def display_dashboard():
@@ -880,11 +1170,11 @@ def display_dashboard():
 
     # Define navigation based on role
     menu_options = ["Profile"]
-    if user['role'] == 'student':
+    if user['role'] == ROLE_STUDENT:
         menu_options.extend(["My Room", "Room Requests", "Maintenance", "Events", "Fees", "Visitors", "Feedback"])
-    elif user['role'] == 'staff':
+    elif user['role'] == ROLE_STAFF:
         menu_options.extend(["Maintenance", "Visitors"])
-    elif user['role'] == 'admin':
+    elif user['role'] == ROLE_ADMIN:
         menu_options.extend(["Room Management", "Room Requests", "Maintenance", "Events", "Fees", "Visitors", "Feedback", "User Management (View Only)"])
 
     if 'current_view' not in st.session_state:
@@ -893,10 +1183,12 @@ def display_dashboard():
     st.session_state.current_view = st.sidebar.radio("Navigation", menu_options, index=menu_options.index(st.session_state.current_view))
 
     if st.sidebar.button("Logout"):
+        clear_password_cache()
         st.session_state.logged_in = False
         st.session_state.user = None
         st.session_state.page = "Login"
-        keys_to_clear = ['current_view', 'editing_room_id', 'active_request_id', 'active_event_id']
+        keys_to_clear = ['user_oid', 'current_view', 'rooms_page', 'editing_room_id', 'active_request_id', 'active_event_id', 'pending_requests_limit', 'maint_limit',
+                         'fees_page', 'visitors_page', 'feedback_page', 'users_page', 'pending_fee_ops']
         for key in keys_to_clear:
             if key in st.session_state:
                 del st.session_state[key]
@@ -911,9 +1203,9 @@ def display_dashboard():
         st.write(f"**Role:** {user['role'].capitalize()}")
         st.write(f"**Unique User ID:** {user['userId']}")
 
-    elif st.session_state.current_view == "Room Management" and user['role'] == 'admin':
+    elif st.session_state.current_view == "Room Management" and user['role'] == ROLE_ADMIN:
         display_room_management()
-    elif st.session_state.current_view == "My Room" and user['role'] == 'student':
+    elif st.session_state.current_view == "My Room" and user['role'] == ROLE_STUDENT:
         display_room_management()
 
     elif st.session_state.current_view == "Room Requests":
@@ -934,19 +1226,33 @@ def display_dashboard():
     elif st.session_state.current_view == "Feedback":
         display_feedback()
 
-    elif st.session_state.current_view == "User Management (View Only)" and user['role'] == 'admin':
+    elif st.session_state.current_view == "User Management (View Only)" and user['role'] == ROLE_ADMIN:
         st.subheader("All Users")
+        users_page = st.session_state.get('users_page', 0)
+        # The page limit keeps this to a single batch; rows are rendered straight off the cursor
+        users_cursor = (get_users_collection()
+                        .find({}, {"_id": 0, "name": 1, "email": 1, "role": 1, "userId": 1})
+                        .sort("_id", 1)
+                        .skip(users_page * RECORDS_PAGE_SIZE)
+                        .limit(RECORDS_PAGE_SIZE + 1))
+        shown = 0
+        has_next_users = False
         try:
-            all_db_users = list(get_users_collection().find({}, {"password": 0}))
+            for u_db in users_cursor:
+                if shown == RECORDS_PAGE_SIZE:
+                    has_next_users = True
+                    break
+                st.write(f"**Name:** {u_db['name']}, **Email:** {u_db['email']}, **Role:** {u_db['role']}, **ID:** {u_db['userId']}")
+                st.markdown("---")
+                shown += 1
         except Exception as e:
             st.error(f"Failed to fetch users: {str(e)}")
             return
-        if not all_db_users:
+        finally:
+            users_cursor.close()
+        if shown == 0 and users_page == 0:
             st.info("No users found.")
-        else:
-            for u_db in all_db_users:
-                st.write(f"**Name:** {u_db['name']}, **Email:** {u_db['email']}, **Role:** {u_db['role']}, **ID:** {u_db['userId']}")
-                st.markdown("---")
+        render_pager("users_page", has_next_users)
 
 # --- Main App Router ---
 if not st.session_state.logged_in:
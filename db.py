@@ -1,80 +1,242 @@
 import pymongo
+from pymongo import UpdateOne
 import os
 import string
-import random
+import secrets
+import hashlib
+import functools
+import threading
+import bcrypt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()  # For local development with a .env file
 
-class MongoDBConnection:
-    _instance = None
+INDEX_BUILD_TIMEOUT_S = 300
+
+# Non-unique indexes: (collection, keys)
+_READ_INDEXES = [
+    ("users", "role"),
+    ("rooms", "userId"),
+    ("rooms", "status"),
+    ("room_requests", [("userId", 1), ("status", 1)]),
+    ("room_requests", [("status", 1), ("requestedAt", -1)]),
+    ("maintenance", [("userId", 1), ("createdAt", -1)]),
+    ("maintenance", "createdAt"),
+    ("events", "date"),
+    ("fees", [("userId", 1), ("dueDate", 1)]),
+    ("visitors", [("registeredByStudentId", 1), ("visitDate", -1)]),
+    ("feedback", [("userId", 1), ("createdAt", -1)]),
+]
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(MongoDBConnection, cls).__new__(cls)
+class MongoDBConnection:
+    def __init__(self):
+        self.client = None
+        try:
+            mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+            # zstd comes from the zstandard package in requirements.txt; zlib is built in
+            # and is used with servers that do not support zstd.
+            # Writes stay synchronous and acknowledged: every write is followed by a rerun
+            # that reads the changed record back, so w=0 or a per-write event loop would
+            # either show stale data or add latency rather than remove it.
+            self.client = pymongo.MongoClient(
+                mongo_uri,
+                maxPoolSize=50,
+                minPoolSize=5,
+                maxIdleTimeMS=60000,
+                # Fail fast instead of hanging a rerun on an unreachable server
+                serverSelectionTimeoutMS=3000,
+                socketTimeoutMS=5000,
+                retryWrites=True,
+                compressors="zstd,zlib"
+            )
+            self.db = self.client["hostel_management_streamlit"]  # Or your preferred DB name
+            # Test connection
+            self.client.admin.command('ping')
+            print("Successfully connected to MongoDB!")
+            self.ensure_indexes()
+            # Rooms assigned before the assignee copy existed would otherwise show "N/A"
             try:
-                mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-                cls._instance.client = pymongo.MongoClient(mongo_uri)
-                cls._instance.db = cls._instance.client["hostel_management_streamlit"]  # Or your preferred DB name
-                # Test connection
-                cls._instance.client.admin.command('ping')
-                print("Successfully connected to MongoDB!")
-            except pymongo.errors.ConnectionFailure as e:
+                synced = sync_room_assignees(self.db, only_missing=True)
+                if synced:
+                    print(f"Backfilled assignee details on {synced} rooms.")
+            except pymongo.errors.PyMongoError as e:
+                print(f"Could not backfill room assignees: {e}")
+        except Exception as e:
+            if isinstance(e, pymongo.errors.ConnectionFailure):
                 print(f"Could not connect to MongoDB: {e}")
-                cls._instance = None  # Reset instance if connection fails
+            else:
+                print(f"Could not set up MongoDB: {e}")
+            if self.client is not None:
+                self.client.close()
+            raise
+
+    def ensure_indexes(self):
+        # Indexes mirror the filters/sorts used by the views in app.py.
+        # create_index is a no-op when the index already exists.
+        # Unique indexes are the only duplicate check for emails, userIds and room
+        # numbers, so a failure to build one (e.g. existing duplicates) is raised.
+        # Builds on existing data can outlast the client's 5s socket timeout, so they
+        # run under their own, longer deadline.
+        with pymongo.timeout(INDEX_BUILD_TIMEOUT_S):
+            self.db["users"].create_index("email", unique=True)
+            self.db["users"].create_index("userId", unique=True)
+            self.db["rooms"].create_index("number", unique=True)
+            # The rest only speed up reads; a failure is reported and the others still get built
+            for collection_name, keys in _READ_INDEXES:
+                try:
+                    self.db[collection_name].create_index(keys)
+                except pymongo.errors.OperationFailure as e:
+                    print(f"Could not ensure index {keys} on {collection_name}: {e}")
+
+    def run_transaction(self, callback):
+        # Multi-document transactions need a replica set. On a standalone server
+        # (error code 20, IllegalOperation) the callback runs without a session.
+        try:
+            with self.client.start_session() as session:
+                return session.with_transaction(callback)
+        except pymongo.errors.OperationFailure as e:
+            if e.code != 20:
                 raise
-        return cls._instance
+            return callback(None)
 
     def get_collection(self, collection_name):
         if self.client is None or self.db is None:
             raise Exception("MongoDB connection not established.")
         return self.db[collection_name]
 
-# Helper to generate 6-digit alphanumeric userId
-def generate_unique_id(length=6, max_attempts=10):
-    chars = string.ascii_letters + string.digits
-    users_collection = get_users_collection()
-    for _ in range(max_attempts):
-        new_id = ''.join(random.choice(chars) for _ in range(length))
-        if not users_collection.find_one({"userId": new_id}):
-            return new_id
-    raise Exception("Failed to generate unique ID after maximum attempts.")
+# --- Password Hashing ---
+# bcrypt is CPU-bound but releases the GIL while hashing, so a thread pool runs
+# hashes in parallel without extra processes; the Streamlit script thread only
+# waits on the result and other sessions keep rerunning meanwhile.
+_BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+def _do_hash(password):
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+def _do_check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+def _run_bcrypt(fn, *args):
+    return _BCRYPT_POOL.submit(fn, *args).result()
+
+def hash_password(password):
+    return _run_bcrypt(_do_hash, password.encode('utf-8'))
+
+# Successful verifications are remembered in process memory only, keyed by the stored
+# hash and a SHA-256 of the candidate password, so a repeat check skips bcrypt.
+# Bounded LRU; cleared on logout via clear_password_cache().
+_VERIFIED_CACHE = OrderedDict()
+_VERIFIED_CACHE_SIZE = 1024
+_VERIFIED_CACHE_LOCK = threading.Lock()
+
+def check_password(password, hashed):
+    password = password.encode('utf-8')
+    key = (bytes(hashed), hashlib.sha256(password).hexdigest())
+    with _VERIFIED_CACHE_LOCK:
+        if key in _VERIFIED_CACHE:
+            _VERIFIED_CACHE.move_to_end(key)
+            return True
+    if not _run_bcrypt(_do_check, password, hashed):
+        return False
+    with _VERIFIED_CACHE_LOCK:
+        _VERIFIED_CACHE[key] = True
+        if len(_VERIFIED_CACHE) > _VERIFIED_CACHE_SIZE:
+            _VERIFIED_CACHE.popitem(last=False)
+    return True
+
+def clear_password_cache():
+    with _VERIFIED_CACHE_LOCK:
+        _VERIFIED_CACHE.clear()
+
+# Helper to generate 6-digit alphanumeric userId.
+# Uniqueness is enforced by the unique index on users.userId; callers retry on DuplicateKeyError.
+_ID_CHARS = string.ascii_letters + string.digits
+
+def generate_unique_id(length=6):
+    return ''.join(secrets.choice(_ID_CHARS) for _ in range(length))
+
+# --- Shared Connection ---
+# One pooled client per server process, shared by every Streamlit session and rerun.
+# Each session reruns on its own thread, so creation is serialized by a lock; the
+# unlocked check keeps the common path lock-free once the connection exists.
+# A failed connection raises and is not cached, so the next call retries.
+_CONNECTION = None
+_CONNECTION_LOCK = threading.Lock()
+
+def get_connection():
+    global _CONNECTION
+    if _CONNECTION is None:
+        with _CONNECTION_LOCK:
+            if _CONNECTION is None:
+                _CONNECTION = MongoDBConnection()
+    return _CONNECTION
+
+@functools.lru_cache(maxsize=1)
+def _db():
+    return get_connection().db
 
 # --- Collection Getters (Convenience) ---
 def get_users_collection():
-    return MongoDBConnection().get_collection("users")
+    return _db()["users"]
 
 def get_rooms_collection():
-    return MongoDBConnection().get_collection("rooms")
+    return _db()["rooms"]
 
 def get_room_requests_collection():
-    return MongoDBConnection().get_collection("room_requests")
+    return _db()["room_requests"]
 
 def get_maintenance_collection():
-    return MongoDBConnection().get_collection("maintenance")
+    return _db()["maintenance"]
 
 def get_events_collection():
-    return MongoDBConnection().get_collection("events")
+    return _db()["events"]
 
 def get_fees_collection():
-    return MongoDBConnection().get_collection("fees")
+    return _db()["fees"]
 
 def get_visitors_collection():
-    return MongoDBConnection().get_collection("visitors")
+    return _db()["visitors"]
 
 def get_feedback_collection():
-    return MongoDBConnection().get_collection("feedback")
+    return _db()["feedback"]
+
+# Rooms store a copy of the assigned user's name and userId (assignedUserName /
+# assignedUserCustomId). Re-sync them from users, e.g. after user names change.
+# With only_missing=True just the rooms that never got the copy are filled in;
+# this runs on every new connection, so older data needs no manual migration.
+def sync_room_assignees(db=None, only_missing=False):
+    if db is None:
+        db = _db()
+    rooms_collection = db["rooms"]
+    query = {"userId": {"$ne": None}}
+    if only_missing:
+        query["assignedUserCustomId"] = {"$exists": False}
+    assigned_rooms = list(rooms_collection.find(query, {"userId": 1}))
+    if not assigned_rooms:
+        return 0
+    user_ids = [room['userId'] for room in assigned_rooms]
+    users_map = {u['_id']: u for u in db["users"].find({"_id": {"$in": user_ids}}, {"name": 1, "userId": 1})}
+    ops = []
+    for room in assigned_rooms:
+        user = users_map.get(room['userId'])
+        ops.append(UpdateOne({"_id": room['_id']}, {"$set": {
+            "assignedUserName": user['name'] if user else None,
+            "assignedUserCustomId": user['userId'] if user else None
+        }}))
+    rooms_collection.bulk_write(ops, ordered=False)
+    return len(ops)
 
 if __name__ == '__main__':
-    # Test the singleton
-    db_conn1 = MongoDBConnection()
-    db_conn2 = MongoDBConnection()
+    # Test the shared connection
+    db_conn1 = get_connection()
+    db_conn2 = get_connection()
     print(f"db_conn1 is db_conn2: {db_conn1 is db_conn2}")
 
     users_col = get_users_collection()
     print(f"Users collection: {users_col.name}")
-    # You can create indexes here if needed, e.g., for unique fields
-    users_col.create_index("email", unique=True)
-    users_col.create_index("userId", unique=True)
-    get_rooms_collection().create_index("number", unique=True)
-    print("Indexes ensured.")
\ No newline at end of file
+    # Indexes are created on first connection; calling again is harmless
+    db_conn1.ensure_indexes()
+    print("Indexes ensured.")
+    print(f"Synced assignee details on {sync_room_assignees()} rooms.")
\ No newline at end of file